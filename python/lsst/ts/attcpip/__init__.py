@@ -29,4 +29,5 @@ from .at_simulator import *
 from .command_issued import *
 from .csc import *
 from .enums import *
+from .event_loop import *
 from .schemas import *
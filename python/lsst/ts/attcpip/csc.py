@@ -22,7 +22,10 @@
 __all__ = ["AtTcpipCsc"]
 
 import asyncio
+import json
 import pathlib
+import re
+import sys
 import types
 import typing
 
@@ -48,6 +51,75 @@ WAIT_TIMEOUT = 1.0
 # Timeout [s] for commands to report they're done.
 CMD_DONE_TIMEOUT = 60.0
 
+# Regular expressions to extract the value of the "id" field from a raw JSON
+# message without having to parse the whole message. Only an "id" that is the
+# first or the last key of the top-level object gets matched, so the match
+# never comes from a nested object.
+ID_FIRST_REGEX = re.compile(rb'\s*\{\s*"id"\s*:\s*"([^"]*)"')
+ID_LAST_REGEX = re.compile(rb'"id"\s*:\s*"([^"]*)"\s*\}\s*$')
+
+# The number of bytes at the end of a raw JSON message to search for the "id"
+# field.
+ID_PEEK_SIZE = 128
+
+
+def _peek_id(raw_data: bytes) -> str | None:
+    """Extract the value of the top-level "id" field from a raw JSON message
+    without parsing it.
+
+    Only the start and the last `ID_PEEK_SIZE` bytes of the message are
+    searched, so the cost does not depend on the size of the message.
+
+    Parameters
+    ----------
+    raw_data : `bytes`
+        The raw JSON message.
+
+    Returns
+    -------
+    data_id : `str` or `None`
+        The value of the "id" field or None if it is neither the first nor the
+        last key of the message.
+    """
+    match = ID_FIRST_REGEX.match(raw_data)
+    if match is None:
+        match = ID_LAST_REGEX.search(raw_data, max(0, len(raw_data) - ID_PEEK_SIZE))
+    return None if match is None else match.group(1).decode()
+
+
+# Dict of command response: CommandIssued method to call.
+ACK_HANDLERS: dict[str, typing.Callable[[CommandIssued], None]] = {
+    Ack.ACK: CommandIssued.set_ack,
+    Ack.NOACK: CommandIssued.set_noack,
+    Ack.SUCCESS: CommandIssued.set_success,
+    Ack.FAIL: CommandIssued.set_fail,
+}
+
+
+def _create_eager_task(
+    coro: typing.Coroutine[typing.Any, typing.Any, None],
+) -> asyncio.Task:
+    """Create a task that, if supported, starts executing immediately.
+
+    With Python 3.12 and newer the coroutine runs eagerly until its first
+    suspension point, which saves one iteration of the event loop. The task
+    is created directly, so a task factory set on the event loop is not
+    used. Older Python versions create a regular task.
+
+    Parameters
+    ----------
+    coro : `typing.Coroutine`
+        The coroutine to wrap in a task.
+
+    Returns
+    -------
+    task : `asyncio.Task`
+        The task.
+    """
+    if sys.version_info >= (3, 12):
+        return asyncio.Task(coro, loop=asyncio.get_running_loop(), eager_start=True)
+    return asyncio.create_task(coro)
+
 
 class AtTcpipCsc(salobj.ConfigurableCsc):
     """Base Configurable CSC with common code.
@@ -280,38 +352,58 @@ class AtTcpipCsc(salobj.ConfigurableCsc):
 
         if self.simulation_mode == 1:
             assert self.simulator is not None
-            await self.simulator.cmd_evt_server.start_task
-            await self.simulator.telemetry_server.start_task
+            await asyncio.gather(
+                self.simulator.cmd_evt_server.start_task,
+                self.simulator.telemetry_server.start_task,
+            )
             host = self.simulator.cmd_evt_server.host
             cmd_evt_port = self.simulator.cmd_evt_server.port
             telemetry_port = self.simulator.telemetry_server.port
 
         # Stop the clients in case the configuration has changed.
+        stop_coros: list[typing.Coroutine[typing.Any, typing.Any, None]] = []
         if self.cmd_evt_client.connected and (
             self.cmd_evt_client.host != host or self.cmd_evt_client.port != cmd_evt_port
         ):
-            await self._stop_cmd_evt_task_and_client()
+            stop_coros.append(self._stop_cmd_evt_task_and_client())
         if self.telemetry_client.connected and (
             self.telemetry_client.host != host
             or self.telemetry_client.port != telemetry_port
         ):
-            await self._stop_telemetry_task_and_client()
+            stop_coros.append(self._stop_telemetry_task_and_client())
+        await asyncio.gather(*stop_coros)
 
+        # The clients are independent so start them concurrently.
+        start_coros: list[typing.Coroutine[typing.Any, typing.Any, None]] = []
         if not self.cmd_evt_client.connected:
-            self.log.debug("Starting cmd_evt client.")
-            self.cmd_evt_client = tcpip.Client(
-                host=host, port=cmd_evt_port, log=self.log, name="CmdEvtClient"
+            start_coros.append(
+                self._start_cmd_evt_task_and_client(host=host, port=cmd_evt_port)
             )
-            await self.cmd_evt_client.start_task
-            self._event_task = asyncio.create_task(self.cmd_evt_loop())
-
         if not self.telemetry_client.connected:
-            self.log.debug("Starting telemetry client.")
-            self.telemetry_client = tcpip.Client(
-                host=host, port=telemetry_port, log=self.log, name="TelemetryClient"
+            start_coros.append(
+                self._start_telemetry_task_and_client(host=host, port=telemetry_port)
             )
-            await self.telemetry_client.start_task
-            self._telemetry_task = asyncio.create_task(self.telemetry_loop())
+        await asyncio.gather(*start_coros)
+
+    async def _start_cmd_evt_task_and_client(
+        self, host: str | None, port: int | None
+    ) -> None:
+        self.log.debug("Starting cmd_evt client.")
+        self.cmd_evt_client = tcpip.Client(
+            host=host, port=port, log=self.log, name="CmdEvtClient"
+        )
+        await self.cmd_evt_client.start_task
+        self._event_task = _create_eager_task(self.cmd_evt_loop())
+
+    async def _start_telemetry_task_and_client(
+        self, host: str | None, port: int | None
+    ) -> None:
+        self.log.debug("Starting telemetry client.")
+        self.telemetry_client = tcpip.Client(
+            host=host, port=port, log=self.log, name="TelemetryClient"
+        )
+        await self.telemetry_client.start_task
+        self._telemetry_task = _create_eager_task(self.telemetry_loop())
 
     async def _stop_cmd_evt_task_and_client(self) -> None:
         if not self._event_task.done():
@@ -328,13 +420,17 @@ class AtTcpipCsc(salobj.ConfigurableCsc):
 
         If simulator_mode == 1 then the simulator gets stopped as well.
         """
-        await self._stop_telemetry_task_and_client()
-        await self._stop_cmd_evt_task_and_client()
+        await asyncio.gather(
+            self._stop_telemetry_task_and_client(),
+            self._stop_cmd_evt_task_and_client(),
+        )
 
         if self.simulator is not None:
             self.log.debug("Closing simulator servers.")
-            await self.simulator.telemetry_server.close()
-            await self.simulator.cmd_evt_server.close()
+            await asyncio.gather(
+                self.simulator.telemetry_server.close(),
+                self.simulator.cmd_evt_server.close(),
+            )
 
     async def close_tasks(self) -> None:
         """Shut down pending tasks. Called by `close`.
@@ -351,10 +447,21 @@ class AtTcpipCsc(salobj.ConfigurableCsc):
         This loop waits for incoming command and event messages and processes
         them when they arrive.
         """
+        # Bind frequently used attributes to locals to speed up the loop.
+        readuntil = self.cmd_evt_client.readuntil
+        terminator = self.cmd_evt_client.terminator
+        commands_issued = self.commands_issued
+        id_key = CommonCommandArgument.ID
+        sequence_id_key = CommonCommandArgument.SEQUENCE_ID
+
         while True:
-            data = await self.cmd_evt_client.read_json()
+            raw_data = await readuntil(terminator)
+            data = json.loads(raw_data)
             self.log.debug(f"Received cmd_evt {data=}")
-            data_id: str = data[CommonCommandArgument.ID]
+            if id_key not in data:
+                self.log.warning(f"Received cmd_evt without id {data=}. Ignoring.")
+                continue
+            data_id: str = data[id_key]
 
             # If data_id starts with "evt_" then handle the event data.
             if data_id.startswith("evt_"):
@@ -373,20 +480,11 @@ class AtTcpipCsc(salobj.ConfigurableCsc):
                 except ValueError:
                     pass
                 await self.call_set_write(data=data)
-            elif CommonCommandArgument.SEQUENCE_ID in data:
-                sequence_id = data[CommonCommandArgument.SEQUENCE_ID]
-                response = data[CommonCommandArgument.ID]
-                match response:
-                    case Ack.ACK:
-                        self.commands_issued[sequence_id].set_ack()
-                    case Ack.NOACK:
-                        self.commands_issued[sequence_id].set_noack()
-                    case Ack.SUCCESS:
-                        self.commands_issued[sequence_id].set_success()
-                    case Ack.FAIL:
-                        self.commands_issued[sequence_id].set_fail()
-                    case _:
-                        raise RuntimeError(f"Received unexpected {response=}.")
+            elif sequence_id_key in data:
+                ack_handler = ACK_HANDLERS.get(data_id)
+                if ack_handler is None:
+                    raise RuntimeError(f"Received unexpected response {data_id=}.")
+                ack_handler(commands_issued[data[sequence_id_key]])
             else:
                 await self.fault(
                     code=None,
@@ -399,26 +497,36 @@ class AtTcpipCsc(salobj.ConfigurableCsc):
         This loop waits for incoming telemetry messages and processes them when
         they arrive.
         """
+        # Bind frequently used attributes to locals to speed up the loop.
+        readuntil = self.telemetry_client.readuntil
+        terminator = self.telemetry_client.terminator
+        unrecognized_telemetry_topics = self.unrecognized_telemetry_topics
+        id_key = CommonCommandArgument.ID
+
         while True:
-            data = await self.telemetry_client.read_json()
-            data_id = ""
-            try:
-                data_id = data[CommonCommandArgument.ID]
-            except Exception:
-                self.log.warning(f"Unable to parse {data=}. Ignoring.")
+            raw_data = await readuntil(terminator)
+            # Peek at the id first so unrecognized telemetry topics can be
+            # dropped without parsing the whole message.
+            if _peek_id(raw_data) in unrecognized_telemetry_topics:
+                continue
+            data = json.loads(raw_data)
+            if id_key not in data:
+                self.log.warning(f"Received telemetry without id {data=}. Ignoring.")
+                continue
+            data_id: str = data[id_key]
             if data_id.startswith("tel_"):
-                if data_id not in self.unrecognized_telemetry_topics:
+                if data_id not in unrecognized_telemetry_topics:
                     try:
                         getattr(self, data_id)
                     except Exception:
                         self.log.warning(
                             f"Unknown telemetry topic {data_id}. Ignoring."
                         )
-                        self.unrecognized_telemetry_topics.add(data_id)
+                        unrecognized_telemetry_topics.add(data_id)
                     else:
                         await self.call_set_write(data=data)
             else:
-                await self.log.error(f"Received non-telemetry {data=}.")
+                self.log.error(f"Received non-telemetry {data=}.")
 
     async def write_command(
         self, command: str, **params: dict[str, typing.Any]
@@ -446,8 +554,8 @@ class AtTcpipCsc(salobj.ConfigurableCsc):
         """
         sequence_id = next(self._command_sequence_id_generator)
         data: dict[str, typing.Any] = {
-            CommonCommandArgument.ID.value: command,
-            CommonCommandArgument.SEQUENCE_ID.value: sequence_id,
+            CommonCommandArgument.ID: command,
+            CommonCommandArgument.SEQUENCE_ID: sequence_id,
         }
         for param in params:
             data[param] = params[param]
@@ -470,21 +578,21 @@ class AtTcpipCsc(salobj.ConfigurableCsc):
         Parameters
         ----------
         data : `dict`[`str`, `Any`]
-            Data.
+            Data. The name is popped from ``data`` so the remaining items can
+            be passed on as is, which means that ``data`` gets modified.
         """
-        name: str = data["id"]
-        kwargs = {key: value for key, value in data.items() if key != "id"}
+        name: str = data.pop(CommonCommandArgument.ID)
         attr = getattr(self, f"{name}", None)
         send_failure = False
         if attr is not None:
             if name.startswith("evt_"):
-                self.log.debug(f"Sending {name=} with {kwargs=}")
+                self.log.debug(f"Sending {name=} with {data=}")
             try:
-                await attr.set_write(**kwargs)
+                await attr.set_write(**data)
             except Exception:
                 send_failure = True
-                self.log.exception(f"Failed to send {name=} with {kwargs=}")
+                self.log.exception(f"Failed to send {name=} with {data=}")
             if name.startswith("evt_") and not send_failure:
-                self.log.debug(f"Done sending {name=} with {kwargs=}")
+                self.log.debug(f"Done sending {name=} with {data=}")
         else:
             self.log.error(f"{name=} not found. Ignoring.")
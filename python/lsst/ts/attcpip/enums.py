@@ -25,6 +25,7 @@ __all__ = [
     "CommonCommandArgument",
     "CommonEvent",
     "CommonEventArgument",
+    "EventLoopType",
 ]
 
 import enum
@@ -70,3 +71,11 @@ class CommonEventArgument(enum.StrEnum):
     ERROR_REPORT = "errorReport"
     SUMMARY_STATE = "summaryState"
     TRACEBACK = "traceback"
+
+
+class EventLoopType(enum.StrEnum):
+    """Enum containing all supported asyncio event loop types."""
+
+    DEFAULT = "default"
+    RLOOP = "rloop"
+    UVLOOP = "uvloop"
@@ -0,0 +1,77 @@
+# This file is part of ts_attcpip.
+#
+# Developed for the Vera C. Rubin Observatory Telescope and Site Systems.
+# This product includes software developed by the LSST Project
+# (https://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+__all__ = ["EVENT_LOOP_ENV_VAR", "configure_event_loop_policy"]
+
+import asyncio
+import importlib
+import logging
+import os
+
+from .enums import EventLoopType
+
+# Name of the environment variable to select the event loop type with.
+EVENT_LOOP_ENV_VAR = "ATTCPIP_EVENT_LOOP"
+
+
+def configure_event_loop_policy(log: logging.Logger | None = None) -> None:
+    """Set the asyncio event loop policy as selected by the
+    ``ATTCPIP_EVENT_LOOP`` environment variable.
+
+    Call this in the CSC entry point, before the event loop is created. The
+    supported values are listed in `EventLoopType`. If the environment
+    variable is not set, or the selected event loop package is not installed,
+    the default asyncio event loop is used.
+
+    Parameters
+    ----------
+    log : `logging.Logger` or `None`, optional
+        Logger. If None then a module logger is used.
+
+    Raises
+    ------
+    ValueError
+        If the environment variable contains an unsupported value.
+
+    Notes
+    -----
+    rloop uses io_uring and benefits most when the messages that are read are
+    small to medium sized, which is the case for the AT servers.
+    """
+    if log is None:
+        log = logging.getLogger(__name__)
+
+    event_loop_type = EventLoopType(
+        os.environ.get(EVENT_LOOP_ENV_VAR, EventLoopType.DEFAULT)
+    )
+    if event_loop_type == EventLoopType.DEFAULT:
+        return
+
+    try:
+        event_loop_module = importlib.import_module(event_loop_type.value)
+    except ImportError:
+        log.warning(
+            f"Cannot import {event_loop_type.value}. Using the default event loop."
+        )
+        return
+
+    log.info(f"Using the {event_loop_type.value} event loop.")
+    asyncio.set_event_loop_policy(event_loop_module.EventLoopPolicy())
@@ -19,223 +19,298 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
+import asyncio
 import contextlib
+import json
+import logging
 import os
 import pathlib
 import typing
 import unittest
 from unittest import mock
 
-import yaml
 from lsst.ts import attcpip, salobj, tcpip
 from lsst.ts.xml import sal_enums
+from test_simulator import UnitTestSimulator
+
+# Always use a dedicated topic subname so the tests never publish to the
+# topics of a running system.
+os.environ["LSST_TOPIC_SUBNAME"] = "test_attcpip"
+os.environ.setdefault("LSST_SITE", "test")
+os.environ.setdefault("LSST_DDS_PARTITION_PREFIX", "test")
 
 CONFIG_DIR = pathlib.Path(__file__).parent / "data" / "config"
-CONFIG_SCHEMA = yaml.safe_load(
-    """
-    $schema: http://json-schema.org/draft-07/schema#
-    $id: https://github.com/lsst-ts/ts_atmcssimulator/blob/main/python/lsst/ts/atmcssimulator/config_schema.py
-    title: MTDome v1
-    description: Schema for ATMCS CSC configuration files.
-    type: object
-    properties:
-      host:
-        description: IP address of the TCP/IP interface.
-        type: string
-        format: hostname
-      cmd_evt_port:
-        description: Port number of the command and event TCP/IP interface.
-        type: integer
-      telemetry_port:
-        description: Port number of the telemetry TCP/IP interface.
-        type: integer
-    required:
-      - host
-      - cmd_evt_port
-      - telemetry_port
-    additionalProperties: false
-    """
-)
-
-# Timeout [s].
-TIMEOUT = 1.0
-
-# The ports for the simulator.
-CMD_EVT_PORT = 5000
-TELEMETRY_PORT = 6000
+CONFIG_SCHEMA = {
+    "$schema": "http://json-schema.org/draft-07/schema#",
+    "$id": "https://github.com/lsst-ts/ts_atmcssimulator/blob/main/python/lsst/ts/"
+    "atmcssimulator/config_schema.py",
+    "title": "MTDome v1",
+    "description": "Schema for ATMCS CSC configuration files.",
+    "type": "object",
+    "properties": {
+        "host": {
+            "description": "IP address of the TCP/IP interface.",
+            "type": "string",
+            "format": "hostname",
+        },
+        "cmd_evt_port": {
+            "description": "Port number of the command and event TCP/IP interface.",
+            "type": "integer",
+        },
+        "telemetry_port": {
+            "description": "Port number of the telemetry TCP/IP interface.",
+            "type": "integer",
+        },
+    },
+    "required": ["host", "cmd_evt_port", "telemetry_port"],
+    "additionalProperties": False,
+}
+
+# Timeout [s]. Slow CI machines can increase it with TS_ATTCPIP_TEST_TIMEOUT.
+TIMEOUT = float(os.environ.get("TS_ATTCPIP_TEST_TIMEOUT", "1.0"))
+
+# Command data for the state transition commands. Treat as read-only.
+DATA = salobj.BaseMsgType()
+DATA.configurationOverride = ""
+
+
+class UnitTestCsc(attcpip.AtTcpipCsc):
+    """AtTcpipCsc that does not require ``do_`` methods for all commands."""
+
+    version = "UnitTest"
+
+    def _assert_do_methods_present(self) -> None:
+        pass
 
 
 class CscTestCase(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        # Create the simulator, CSC and Remote once per test and close them in
+        # reverse order when the test is done.
+        async with contextlib.AsyncExitStack() as stack:
+            self.simulator = await stack.enter_async_context(self.create_at_simulator())
+            self.csc = await stack.enter_async_context(
+                UnitTestCsc(
+                    name="Test",
+                    index=0,
+                    config_schema=CONFIG_SCHEMA,
+                    config_dir=CONFIG_DIR,
+                    initial_state=salobj.State.STANDBY,
+                    simulation_mode=1,
+                )
+            )
+            self.remote = await stack.enter_async_context(
+                salobj.Remote(
+                    domain=self.csc.domain,
+                    name=self.csc.salinfo.name,
+                    index=self.csc.salinfo.index,
+                )
+            )
+            self.csc.simulator = self.simulator
+            self.addAsyncCleanup(stack.pop_all().aclose)
+
     @contextlib.asynccontextmanager
     async def create_at_simulator(
-        self, go_to_fault_state: bool
-    ) -> typing.AsyncGenerator[None, None]:
-        os.environ["LSST_TOPIC_SUBNAME"] = "test_attcpip"
-        os.environ["LSST_SITE"] = "test"
-        os.environ["LSST_DDS_PARTITION_PREFIX"] = "test"
-        attcpip.AtTcpipCsc.version = "UnitTest"
-
-        with mock.patch.object(
-            salobj.Controller, "_assert_do_methods_present"
-        ), mock.patch.object(attcpip.AtSimulator, "cmd_evt_connect_callback"):
-            async with attcpip.AtSimulator(
-                host=tcpip.LOCALHOST_IPV4,
-                cmd_evt_port=CMD_EVT_PORT,
-                telemetry_port=TELEMETRY_PORT,
-            ) as self.simulator:
-                self.simulator.go_to_fault_state = go_to_fault_state
-                await self.simulator.cmd_evt_server.start_task
-                await self.simulator.telemetry_server.start_task
-                yield
+        self,
+    ) -> typing.AsyncGenerator[UnitTestSimulator, None]:
+        """Create and start an AtSimulator.
+
+        The OS picks free ports for the simulator servers.
+        """
+        async with UnitTestSimulator(
+            host=tcpip.LOCALHOST_IPV4,
+            cmd_evt_port=0,
+            telemetry_port=0,
+        ) as simulator:
+            await asyncio.gather(
+                simulator.cmd_evt_server.start_task,
+                simulator.telemetry_server.start_task,
+            )
+            yield simulator
 
     async def test_csc_without_fault_state(self) -> None:
         """Test without the simulator going to FAULT state."""
-        async with self.create_at_simulator(
-            go_to_fault_state=False
-        ), attcpip.AtTcpipCsc(
-            name="Test",
-            index=0,
-            config_schema=CONFIG_SCHEMA,
-            config_dir=CONFIG_DIR,
-            initial_state=salobj.State.STANDBY,
-            simulation_mode=1,
-        ) as csc, salobj.Remote(
-            domain=csc.domain,
-            name=csc.salinfo.name,
-            index=csc.salinfo.index,
-        ) as remote:
-            csc.simulator = self.simulator
-            data = salobj.BaseMsgType()
-            data.configurationOverride = ""
-            assert self.simulator.simulator_state == sal_enums.State.STANDBY
-            await remote.evt_summaryState.next(flush=False, timeout=TIMEOUT)
-            assert not csc.cmd_evt_client.connected
-            assert not csc.telemetry_client.connected
-
-            # Repeat to make sure that cmd_evt_client still is connected to the
-            # simulator after going to STANDBY.
-            for _ in range(2):
-                await csc.do_start(data)
-                assert self.simulator.simulator_state == sal_enums.State.DISABLED
-                await remote.evt_summaryState.next(flush=False, timeout=TIMEOUT)
-                assert csc.cmd_evt_client.connected
-                assert csc.telemetry_client.connected
-
-                await csc.do_enable(data)
-                assert self.simulator.simulator_state == sal_enums.State.ENABLED
-                await remote.evt_summaryState.next(flush=False, timeout=TIMEOUT)
-                assert csc.cmd_evt_client.connected
-                assert csc.telemetry_client.connected
+        assert self.simulator.simulator_state == sal_enums.State.STANDBY
+        await self.remote.evt_summaryState.next(flush=False, timeout=TIMEOUT)
+        assert not self.csc.cmd_evt_client.connected
+        assert not self.csc.telemetry_client.connected
 
-                await csc.do_disable(data)
-                assert self.simulator.simulator_state == sal_enums.State.DISABLED
-                await remote.evt_summaryState.next(flush=False, timeout=TIMEOUT)
-                assert csc.cmd_evt_client.connected
-                assert csc.telemetry_client.connected
+        # Repeat to make sure that cmd_evt_client still is connected to the
+        # simulator after going to STANDBY.
+        for _ in range(2):
+            await self.csc.do_start(DATA)
+            assert self.simulator.simulator_state == sal_enums.State.DISABLED
+            await self.remote.evt_summaryState.next(flush=False, timeout=TIMEOUT)
+            assert self.csc.cmd_evt_client.connected
+            assert self.csc.telemetry_client.connected
 
-                await csc.do_standby(data)
-                assert self.simulator.simulator_state == sal_enums.State.STANDBY
-                await remote.evt_summaryState.next(flush=False, timeout=TIMEOUT)
-                assert csc.cmd_evt_client.connected
-                assert not csc.telemetry_client.connected
+            await self.csc.do_enable(DATA)
+            assert self.simulator.simulator_state == sal_enums.State.ENABLED
+            await self.remote.evt_summaryState.next(flush=False, timeout=TIMEOUT)
+            assert self.csc.cmd_evt_client.connected
+            assert self.csc.telemetry_client.connected
+
+            await self.csc.do_disable(DATA)
+            assert self.simulator.simulator_state == sal_enums.State.DISABLED
+            await self.remote.evt_summaryState.next(flush=False, timeout=TIMEOUT)
+            assert self.csc.cmd_evt_client.connected
+            assert self.csc.telemetry_client.connected
+
+            await self.csc.do_standby(DATA)
+            assert self.simulator.simulator_state == sal_enums.State.STANDBY
+            await self.remote.evt_summaryState.next(flush=False, timeout=TIMEOUT)
+            assert self.csc.cmd_evt_client.connected
+            assert not self.csc.telemetry_client.connected
 
     async def test_csc_with_fault_state(self) -> None:
         """Test with the simulator going to FAULT state."""
-        async with self.create_at_simulator(go_to_fault_state=True), attcpip.AtTcpipCsc(
-            name="Test",
-            index=0,
-            config_schema=CONFIG_SCHEMA,
-            config_dir=CONFIG_DIR,
-            initial_state=salobj.State.STANDBY,
-            simulation_mode=1,
-        ) as csc, salobj.Remote(
-            domain=csc.domain,
-            name=csc.salinfo.name,
-            index=csc.salinfo.index,
-        ) as remote:
-            csc.simulator = self.simulator
-            data = salobj.BaseMsgType()
-            data.configurationOverride = ""
+        self.simulator.go_to_fault_state = True
+        assert self.simulator.simulator_state == sal_enums.State.STANDBY
+        await self.remote.evt_summaryState.next(flush=False, timeout=TIMEOUT)
+
+        # Repeat to make sure that both cmd_evt_client and telemetry_client
+        # remain connected to the simulator all the time.
+        for _ in range(2):
+            await self.csc.do_start(DATA)
+            assert self.simulator.simulator_state == sal_enums.State.FAULT
+            # The summaryState and errorCode events are independent.
+            await asyncio.gather(
+                self.remote.evt_summaryState.next(flush=False, timeout=TIMEOUT),
+                self.remote.evt_errorCode.next(flush=False, timeout=TIMEOUT),
+            )
+            assert self.csc.cmd_evt_client.connected
+            assert self.csc.telemetry_client.connected
+
+            await self.csc.do_standby(DATA)
             assert self.simulator.simulator_state == sal_enums.State.STANDBY
-            await remote.evt_summaryState.next(flush=False, timeout=TIMEOUT)
-
-            # Repeat to make sure that both cmd_evt_client and telemetry_client
-            # remain connected to the simulator all the time.
-            for _ in range(2):
-                await csc.do_start(data)
-                assert self.simulator.simulator_state == sal_enums.State.FAULT
-                await remote.evt_summaryState.next(flush=False, timeout=TIMEOUT)
-                await remote.evt_errorCode.next(flush=False, timeout=TIMEOUT)
-                assert csc.cmd_evt_client.connected
-                assert csc.telemetry_client.connected
-
-                await csc.do_standby(data)
-                assert self.simulator.simulator_state == sal_enums.State.STANDBY
-                await remote.evt_summaryState.next(flush=False, timeout=TIMEOUT)
-                assert csc.cmd_evt_client.connected
-                assert csc.telemetry_client.connected
+            await self.remote.evt_summaryState.next(flush=False, timeout=TIMEOUT)
+            assert self.csc.cmd_evt_client.connected
+            assert self.csc.telemetry_client.connected
 
     async def test_csc_with_failed_state_transition(self) -> None:
         """Test with the simulator in a non-standard state."""
-        async with self.create_at_simulator(
-            go_to_fault_state=False
-        ), attcpip.AtTcpipCsc(
-            name="Test",
-            index=0,
-            config_schema=CONFIG_SCHEMA,
-            config_dir=CONFIG_DIR,
-            initial_state=salobj.State.STANDBY,
-            simulation_mode=1,
-        ) as csc, salobj.Remote(
-            domain=csc.domain,
-            name=csc.salinfo.name,
-            index=csc.salinfo.index,
-        ) as remote:
-            csc.simulator = self.simulator
-            data = salobj.BaseMsgType()
-            data.configurationOverride = ""
-            assert self.simulator.simulator_state == sal_enums.State.STANDBY
-            await remote.evt_summaryState.next(flush=False, timeout=TIMEOUT)
-            assert not csc.cmd_evt_client.connected
-            assert not csc.telemetry_client.connected
-
-            for attempt in range(2):
-                await csc.do_start(data)
-                assert self.simulator.simulator_state == sal_enums.State.DISABLED
-                await remote.evt_summaryState.next(flush=False, timeout=TIMEOUT)
-                assert csc.cmd_evt_client.connected
-                assert csc.telemetry_client.connected
-
-                await csc.do_enable(data)
+        assert self.simulator.simulator_state == sal_enums.State.STANDBY
+        await self.remote.evt_summaryState.next(flush=False, timeout=TIMEOUT)
+        assert not self.csc.cmd_evt_client.connected
+        assert not self.csc.telemetry_client.connected
+
+        for attempt in range(2):
+            await self.csc.do_start(DATA)
+            assert self.simulator.simulator_state == sal_enums.State.DISABLED
+            await self.remote.evt_summaryState.next(flush=False, timeout=TIMEOUT)
+            assert self.csc.cmd_evt_client.connected
+            assert self.csc.telemetry_client.connected
+
+            await self.csc.do_enable(DATA)
+            assert self.simulator.simulator_state == sal_enums.State.ENABLED
+            await self.remote.evt_summaryState.next(flush=False, timeout=TIMEOUT)
+            assert self.csc.cmd_evt_client.connected
+            assert self.csc.telemetry_client.connected
+
+            await self.csc.do_disable(DATA)
+            assert self.simulator.simulator_state == sal_enums.State.DISABLED
+            await self.remote.evt_summaryState.next(flush=False, timeout=TIMEOUT)
+            assert self.csc.cmd_evt_client.connected
+            assert self.csc.telemetry_client.connected
+
+            if attempt == 0:
+                # Simulate that the simulator has gone to STANDBY already.
+                await self.csc.wait_cmd_done(attcpip.CommonCommand.STANDBY)
+                # Now try to go to STANDBY. This should not be a problem.
+                await self.csc.do_standby(DATA)
+                assert self.simulator.simulator_state == sal_enums.State.STANDBY
+                await self.remote.evt_summaryState.next(flush=False, timeout=TIMEOUT)
+                assert self.csc.cmd_evt_client.connected
+                assert not self.csc.telemetry_client.connected
+            else:
+                # Simulate that the simulator is in ENABLED.
+                await self.csc.wait_cmd_done(attcpip.CommonCommand.ENABLE)
+                # Now try to go to STANDBY. This should result in a FAULT
+                # state.
+                await self.csc.do_standby(DATA)
                 assert self.simulator.simulator_state == sal_enums.State.ENABLED
-                await remote.evt_summaryState.next(flush=False, timeout=TIMEOUT)
-                assert csc.cmd_evt_client.connected
-                assert csc.telemetry_client.connected
-
-                await csc.do_disable(data)
-                assert self.simulator.simulator_state == sal_enums.State.DISABLED
-                await remote.evt_summaryState.next(flush=False, timeout=TIMEOUT)
-                assert csc.cmd_evt_client.connected
-                assert csc.telemetry_client.connected
-
-                if attempt == 0:
-                    # Simulate that the simulator has gone to STANDBY already.
-                    await csc.wait_cmd_done(attcpip.CommonCommand.STANDBY)
-                    # Now try to go to STANDBY. This should not be a problem.
-                    await csc.do_standby(data)
-                    assert self.simulator.simulator_state == sal_enums.State.STANDBY
-                    await remote.evt_summaryState.next(flush=False, timeout=TIMEOUT)
-                    assert csc.cmd_evt_client.connected
-                    assert not csc.telemetry_client.connected
-                else:
-                    # Simulate that the simulator is in ENABLED.
-                    await csc.wait_cmd_done(attcpip.CommonCommand.ENABLE)
-                    # Now try to go to STANDBY. This should result in a FAULT
-                    # state.
-                    await csc.do_standby(data)
-                    assert self.simulator.simulator_state == sal_enums.State.ENABLED
-                    await remote.evt_summaryState.next(flush=False, timeout=TIMEOUT)
-                    data = await remote.evt_summaryState.next(
-                        flush=False, timeout=TIMEOUT
-                    )
-                    assert data.summaryState == sal_enums.State.FAULT
+                await self.remote.evt_summaryState.next(flush=False, timeout=TIMEOUT)
+                data = await self.remote.evt_summaryState.next(
+                    flush=False, timeout=TIMEOUT
+                )
+                assert data.summaryState == sal_enums.State.FAULT
+
+    async def start_csc(self) -> None:
+        """Go to DISABLED and wait until both simulator servers are connected
+        to the CSC clients.
+        """
+        await self.remote.evt_summaryState.next(flush=False, timeout=TIMEOUT)
+        await self.csc.do_start(DATA)
+        await self.remote.evt_summaryState.next(flush=False, timeout=TIMEOUT)
+        await asyncio.gather(
+            asyncio.wait_for(self.simulator.cmd_evt_server.connected_task, TIMEOUT),
+            asyncio.wait_for(self.simulator.telemetry_server.connected_task, TIMEOUT),
+        )
+
+    async def write_known_telemetry(self, int0: int) -> None:
+        """Write a known telemetry topic and wait for the remote to receive
+        it.
+
+        Since the telemetry loop handles the messages in the order in which
+        they arrive, this also means that all previously written telemetry
+        has been handled.
+        """
+        await self.simulator.telemetry_server.write_json(
+            data={attcpip.CommonCommandArgument.ID: "tel_scalars", "int0": int0}
+        )
+        data = await self.remote.tel_scalars.next(flush=False, timeout=TIMEOUT)
+        assert data.int0 == int0
+
+    async def test_unrecognized_telemetry(self) -> None:
+        """Test that unrecognized telemetry is dropped without parsing it once
+        it is known to be unrecognized and that known telemetry still gets
+        written.
+        """
+        await self.start_csc()
+
+        with mock.patch("lsst.ts.attcpip.csc.json", wraps=json) as mock_json:
+            for int0 in range(3):
+                await self.simulator.telemetry_server.write_json(
+                    data={attcpip.CommonCommandArgument.ID: "tel_unknown", "value": 1}
+                )
+                await self.write_known_telemetry(int0=int0)
+
+        assert self.csc.unrecognized_telemetry_topics == {"tel_unknown"}
+        parsed_data = [call.args[0] for call in mock_json.loads.call_args_list]
+        # Only the first message is parsed to find out that the topic is
+        # unrecognized.
+        assert sum(b"tel_unknown" in data for data in parsed_data) == 1
+        assert sum(b"tel_scalars" in data for data in parsed_data) == 3
+
+    async def test_telemetry_without_id(self) -> None:
+        """Test that telemetry without id is skipped with a warning."""
+        await self.start_csc()
+
+        with self.assertLogs(self.csc.log, level=logging.WARNING) as logs:
+            await self.simulator.telemetry_server.write_json(data={"value": 1})
+            await self.write_known_telemetry(int0=1)
+
+        assert any(
+            "Received telemetry without id" in message for message in logs.output
+        )
+
+    async def test_cmd_evt_without_id(self) -> None:
+        """Test that a command or event without id is skipped with a warning
+        and that the cmd_evt loop keeps running.
+        """
+        await self.start_csc()
+
+        with self.assertLogs(self.csc.log, level=logging.WARNING) as logs:
+            await self.simulator.cmd_evt_server.write_json(data={"value": 1})
+            await self.simulator.cmd_evt_server.write_json(
+                data={
+                    attcpip.CommonCommandArgument.ID: attcpip.CommonEvent.ERROR_CODE,
+                    attcpip.CommonEventArgument.ERROR_CODE: 1,
+                    attcpip.CommonEventArgument.ERROR_REPORT: "Test.",
+                    attcpip.CommonEventArgument.TRACEBACK: "",
+                }
+            )
+            data = await self.remote.evt_errorCode.next(flush=False, timeout=TIMEOUT)
+            assert data.errorCode == 1
+
+        assert any("Received cmd_evt without id" in message for message in logs.output)
@@ -0,0 +1,66 @@
+# This file is part of ts_attcpip.
+#
+# Developed for the Vera C. Rubin Observatory Telescope and Site Systems.
+# This product includes software developed by the LSST Project
+# (https://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import asyncio
+import os
+import sys
+import types
+import unittest
+from unittest import mock
+
+from lsst.ts import attcpip
+
+
+class EventLoopTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.policy = asyncio.get_event_loop_policy()
+
+    def tearDown(self) -> None:
+        asyncio.set_event_loop_policy(self.policy)
+
+    def test_default_event_loop(self) -> None:
+        with mock.patch.dict(os.environ):
+            os.environ.pop(attcpip.EVENT_LOOP_ENV_VAR, None)
+            attcpip.configure_event_loop_policy()
+        assert asyncio.get_event_loop_policy() is self.policy
+
+    def test_missing_event_loop_package(self) -> None:
+        with mock.patch.dict(
+            os.environ, {attcpip.EVENT_LOOP_ENV_VAR: attcpip.EventLoopType.RLOOP}
+        ), mock.patch("importlib.import_module", side_effect=ImportError):
+            attcpip.configure_event_loop_policy()
+        assert asyncio.get_event_loop_policy() is self.policy
+
+    def test_event_loop_package(self) -> None:
+        class EventLoopPolicy(asyncio.DefaultEventLoopPolicy):
+            pass
+
+        fake_uvloop = types.SimpleNamespace(EventLoopPolicy=EventLoopPolicy)
+        with mock.patch.dict(
+            os.environ, {attcpip.EVENT_LOOP_ENV_VAR: attcpip.EventLoopType.UVLOOP}
+        ), mock.patch.dict(sys.modules, {"uvloop": fake_uvloop}):
+            attcpip.configure_event_loop_policy()
+        assert type(asyncio.get_event_loop_policy()) is EventLoopPolicy
+
+    def test_unsupported_event_loop(self) -> None:
+        with mock.patch.dict(os.environ, {attcpip.EVENT_LOOP_ENV_VAR: "unknown"}):
+            with self.assertRaises(ValueError):
+                attcpip.configure_event_loop_policy()
@@ -24,7 +24,6 @@ import contextlib
 import logging
 import typing
 import unittest
-from unittest import mock
 
 from lsst.ts import attcpip, tcpip
 from lsst.ts.xml import sal_enums
@@ -33,6 +32,13 @@ from lsst.ts.xml import sal_enums
 TIMEOUT = 2
 
 
+class UnitTestSimulator(attcpip.AtSimulator):
+    """AtSimulator with a no-op command/event connect callback."""
+
+    async def cmd_evt_connect_callback(self, server: tcpip.OneClientServer) -> None:
+        pass
+
+
 class SimulatorTest(unittest.IsolatedAsyncioTestCase):
     async def asyncSetUp(self) -> None:
         self.log = logging.getLogger(type(self).__name__)
@@ -42,14 +48,15 @@ class SimulatorTest(unittest.IsolatedAsyncioTestCase):
     async def create_at_simulator(
         self, go_to_fault_state: bool
     ) -> typing.AsyncGenerator[None, None]:
-        with mock.patch.object(attcpip.AtSimulator, "cmd_evt_connect_callback"):
-            async with attcpip.AtSimulator(
-                host=tcpip.LOCALHOST_IPV4, cmd_evt_port=5000, telemetry_port=6000
-            ) as self.simulator:
-                self.simulator.go_to_fault_state = go_to_fault_state
-                await self.simulator.cmd_evt_server.start_task
-                await self.simulator.telemetry_server.start_task
-                yield
+        async with UnitTestSimulator(
+            host=tcpip.LOCALHOST_IPV4, cmd_evt_port=0, telemetry_port=0
+        ) as self.simulator:
+            self.simulator.go_to_fault_state = go_to_fault_state
+            await asyncio.gather(
+                self.simulator.cmd_evt_server.start_task,
+                self.simulator.telemetry_server.start_task,
+            )
+            yield
 
     @contextlib.asynccontextmanager
     async def create_cmd_evt_client(
@@ -94,12 +101,7 @@ class SimulatorTest(unittest.IsolatedAsyncioTestCase):
             assert attcpip.CommonEventArgument.ERROR_REPORT in data
             assert attcpip.CommonEventArgument.TRACEBACK in data
 
-    async def execute_command(
-        self,
-        command: attcpip.CommonCommand,
-        expected_state: sal_enums.State,
-        expected_ack: attcpip.Ack,
-    ) -> None:
+    async def write_command(self, command: attcpip.CommonCommand) -> None:
         self.sequence_id += 1
         await self.cmd_evt_client.write_json(
             data={
@@ -107,6 +109,14 @@ class SimulatorTest(unittest.IsolatedAsyncioTestCase):
                 attcpip.CommonCommandArgument.SEQUENCE_ID: self.sequence_id,
             }
         )
+
+    async def execute_command(
+        self,
+        command: attcpip.CommonCommand,
+        expected_state: sal_enums.State,
+        expected_ack: attcpip.Ack,
+    ) -> None:
+        await self.write_command(command)
         await self.verify_command_response(
             ack=attcpip.Ack.ACK, sequence_id=self.sequence_id
         )
@@ -119,23 +129,50 @@ class SimulatorTest(unittest.IsolatedAsyncioTestCase):
 
         assert self.simulator.simulator_state == expected_state
 
+    async def execute_commands_pipelined(
+        self,
+        commands_and_expected_states: list[
+            tuple[attcpip.CommonCommand, sal_enums.State]
+        ],
+    ) -> None:
+        """Write all commands before reading any of the responses.
+
+        The simulator handles the commands in the order in which they arrive,
+        so the responses and events arrive in that order as well. All
+        commands are expected to succeed.
+        """
+        first_sequence_id = self.sequence_id + 1
+        for command, _ in commands_and_expected_states:
+            await self.write_command(command)
+
+        for sequence_id, (_, expected_state) in enumerate(
+            commands_and_expected_states, start=first_sequence_id
+        ):
+            await self.verify_command_response(
+                ack=attcpip.Ack.ACK, sequence_id=sequence_id
+            )
+            await self.verify_command_response(
+                ack=attcpip.Ack.SUCCESS, sequence_id=sequence_id
+            )
+            await self.verify_event(state=expected_state)
+
+        final_state = commands_and_expected_states[-1][1]
+        assert self.simulator.simulator_state == final_state
+
     async def test_stimulator_state_commands(self) -> None:
         async with self.create_at_simulator(
             go_to_fault_state=False
         ), self.create_cmd_evt_client(self.simulator):
             assert self.simulator.simulator_state == sal_enums.State.STANDBY
 
-            commands_and_expected_states = {
-                attcpip.CommonCommand.START: sal_enums.State.DISABLED,
-                attcpip.CommonCommand.ENABLE: sal_enums.State.ENABLED,
-                attcpip.CommonCommand.DISABLE: sal_enums.State.DISABLED,
-                attcpip.CommonCommand.STANDBY: sal_enums.State.STANDBY,
-            }
-
-            for command in commands_and_expected_states:
-                await self.execute_command(
-                    command, commands_and_expected_states[command], attcpip.Ack.SUCCESS
-                )
+            await self.execute_commands_pipelined(
+                [
+                    (attcpip.CommonCommand.START, sal_enums.State.DISABLED),
+                    (attcpip.CommonCommand.ENABLE, sal_enums.State.ENABLED),
+                    (attcpip.CommonCommand.DISABLE, sal_enums.State.DISABLED),
+                    (attcpip.CommonCommand.STANDBY, sal_enums.State.STANDBY),
+                ]
+            )
 
     async def test_fault_state(self) -> None:
         async with self.create_at_simulator(